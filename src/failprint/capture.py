@@ -2,19 +2,43 @@
 
 from __future__ import annotations
 
+import atexit
 import enum
+import io
+import mmap
 import os
 import sys
 import tempfile
-from contextlib import contextmanager
-from io import StringIO
-from typing import IO, TYPE_CHECKING, TextIO
+import threading
+from contextlib import ExitStack, contextmanager
+from typing import IO, TYPE_CHECKING, BinaryIO, TextIO
 
 if TYPE_CHECKING:
     from collections.abc import Iterator
     from types import TracebackType
 
 
+_WINDOWS = sys.platform.startswith("win") or os.name == "nt"
+_STDOUT_FD, _STDERR_FD = 1, 2
+_MMAP_THRESHOLD = 65536
+# An in-memory file captures output without disk I/O, and unlike a pipe it never blocks writers.
+_MEMFD = sys.platform == "linux" and hasattr(os, "memfd_create")
+
+_DEVNULL_FD: int | None = None
+_DEVNULL_LOCK = threading.Lock()
+
+
+def _get_devnull_fd() -> int:
+    # Open devnull once per process, on first use.
+    global _DEVNULL_FD  # noqa: PLW0603
+    if _DEVNULL_FD is None:
+        with _DEVNULL_LOCK:
+            if _DEVNULL_FD is None:
+                _DEVNULL_FD = os.open(os.devnull, os.O_WRONLY)
+                atexit.register(os.close, _DEVNULL_FD)
+    return _DEVNULL_FD
+
+
 class Capture(enum.Enum):
     """An enum to store the different possible output types."""
 
@@ -23,8 +47,10 @@ class Capture(enum.Enum):
     BOTH: str = "both"
     NONE: str = "none"
 
+    _str: str
+
     def __str__(self):
-        return self.value.lower()
+        return self._str
 
     @classmethod
     def cast(cls, value: str | bool | Capture | None) -> Capture:
@@ -36,24 +62,28 @@ class Capture(enum.Enum):
         Returns:
             A Capture enumeration value.
         """
-        if value is None:
-            return cls.BOTH
-        if value is True:
+        if value is None or value is True:
             return cls.BOTH
         if value is False:
             return cls.NONE
         if isinstance(value, cls):
             return value
-        # consider it's a string
-        # let potential errors bubble up
-        return cls(value)
+        try:
+            return _CAST[value]  # type: ignore[index]
+        except (KeyError, TypeError):
+            # consider it's a string
+            # let potential errors bubble up
+            return cls(value)
 
     @contextmanager
-    def here(self, stdin: str | None = None) -> Iterator[CaptureManager]:
+    def here(self, stdin: str | None = None, *, mute: bool = True) -> Iterator[CaptureManager]:
         """Context manager to capture standard output/error.
 
         Parameters:
-            stdin: Optional input.
+            stdin: Optional input. When `None`, standard input is left untouched,
+                while an empty string provides an empty input.
+            mute: Whether to silence the output that is not captured (stderr for `STDOUT`, stdout for `STDERR`).
+                When false, it is left untouched.
 
         Yields:
             A lazy string with the captured contents.
@@ -72,10 +102,23 @@ class Capture(enum.Enum):
             3
             4
         """  # noqa: D301
-        with CaptureManager(self, stdin=stdin) as captured:
+        with CaptureManager(self, stdin=stdin, mute=mute) as captured:
             yield captured
 
 
+for _member in Capture:
+    _member._str = sys.intern(_member.value)
+del _member
+
+# Only string keys: 1 and 0 would otherwise match True and False.
+_CAST: dict[str, Capture] = {
+    "stdout": Capture.STDOUT,
+    "stderr": Capture.STDERR,
+    "both": Capture.BOTH,
+    "none": Capture.NONE,
+}
+
+
 class CaptureManager:
     """Context manager to capture standard output and error at the file descriptor level.
 
@@ -96,23 +139,33 @@ class CaptureManager:
         4
     """  # noqa: D301
 
-    def __init__(self, capture: Capture = Capture.BOTH, stdin: str | None = None) -> None:
+    __slots__ = (
+        "_capture",
+        "_mute",
+        "_output",
+        "_output_bytes",
+        "_restore_stack",
+        "_stdin",
+        "_temp_file",
+    )
+
+    def __init__(self, capture: Capture = Capture.BOTH, stdin: str | None = None, *, mute: bool = True) -> None:
         """Initialize the context manager.
 
         Parameters:
             capture: What to capture.
-            stdin: Optional input.
+            stdin: Optional input. When `None`, standard input is left untouched,
+                while an empty string provides an empty input.
+            mute: Whether to silence the output that is not captured (stderr for `STDOUT`, stdout for `STDERR`).
+                When false, it is left untouched.
         """
-        self._temp_file: IO[str] | None = None
+        self._temp_file: IO[bytes] | None = None
         self._capture = capture
-        self._devnull: TextIO | None = None
+        self._mute = mute
         self._stdin = stdin
-        self._saved_stdin: TextIO | None = None
-        self._stdout_fd: int = -1
-        self._stderr_fd: int = -1
-        self._saved_stdout_fd: int = -1
-        self._saved_stderr_fd: int = -1
+        self._restore_stack: ExitStack | None = None
         self._output: str | None = None
+        self._output_bytes: bytes | mmap.mmap | None = None
 
     def __enter__(self) -> CaptureManager:  # noqa: PYI034 (false-positive)
         if self._capture is Capture.NONE:
@@ -122,35 +175,34 @@ class CaptureManager:
         sys.stdout.flush()
         sys.stderr.flush()
 
-        # Patch sys.stdin if needed.
-        if self._stdin is not None:
-            self._saved_stdin = sys.stdin
-            sys.stdin = StringIO(self._stdin)
-
-        # Open devnull if needed.
-        if self._capture in {Capture.STDOUT, Capture.STDERR}:
-            self._devnull = open(os.devnull, "w")
-
-        # Create temporary file.
-        # Initially we used a pipe but it would hang on writes given enough output.
-        self._temp_file = tempfile.TemporaryFile("w+", encoding="utf8", prefix="failprint-")
-        fdw = self._temp_file.fileno()
-
-        # Redirect stdout to temporary file or devnull.
-        self._stdout_fd = sys.stdout.fileno()
-        self._saved_stdout_fd = os.dup(self._stdout_fd)
-        if self._capture in {Capture.BOTH, Capture.STDOUT}:
-            os.dup2(fdw, self._stdout_fd)
-        elif self._capture is Capture.STDERR:
-            os.dup2(self._devnull.fileno(), self._stdout_fd)  # type: ignore[union-attr]
-
-        # Redirect stderr to temporary file or devnull.
-        self._stderr_fd = sys.stderr.fileno()
-        self._saved_stderr_fd = os.dup(self._stderr_fd)
-        if self._capture in {Capture.BOTH, Capture.STDERR}:
-            os.dup2(fdw, self._stderr_fd)
-        elif self._capture is Capture.STDOUT:
-            os.dup2(self._devnull.fileno(), self._stderr_fd)  # type: ignore[union-attr]
+        with ExitStack() as stack:
+            # Patch sys.stdin if needed.
+            if self._stdin is not None:
+                stack.callback(setattr, sys, "stdin", sys.stdin)
+                sys.stdin = io.StringIO(self._stdin)
+
+            # Create an in-memory or temporary file to capture output.
+            self._temp_file, in_memory = _open_capture_file()
+            fdw = self._temp_file.fileno()
+            stack.callback(self._finish, in_memory=in_memory)
+
+            # Redirect stdout and stderr to in-memory/temporary file or devnull (unless not muting).
+            # Flush them in order (stdout then stderr) before restoring them.
+            streams: list[TextIO] = []
+            for name, target_fd, captured in (
+                ("stdout", _STDOUT_FD, self._capture is not Capture.STDERR),
+                ("stderr", _STDERR_FD, self._capture is not Capture.STDOUT),
+            ):
+                if captured:
+                    streams.extend(_install(stack, name, fdw, target_fd))
+                elif self._mute:
+                    # Muted output is discarded, redirecting the descriptor is enough.
+                    _redirect(stack, _get_devnull_fd(), target_fd)
+                    streams.append(getattr(sys, name))
+            stack.callback(_flush, streams)
+
+            # Everything went well, keep descriptors redirected until exit.
+            self._restore_stack = stack.pop_all()
 
         return self
 
@@ -163,27 +215,14 @@ class CaptureManager:
         if self._capture is Capture.NONE:
             return
 
-        # Flush everything before reading from pipe.
-        sys.stdout.flush()
-        sys.stderr.flush()
-
-        # Restore stdin to its previous value.
-        if self._saved_stdin is not None:
-            sys.stdin = self._saved_stdin
-
-        # Close devnull if needed.
-        if self._devnull is not None:
-            self._devnull.close()
-
-        # Restore stdout and stderr to their previous values.
-        os.dup2(self._saved_stdout_fd, self._stdout_fd)
-        os.dup2(self._saved_stderr_fd, self._stderr_fd)
+        # Flush and restore stdin, stdout and stderr to their previous values, read captured contents.
+        self._restore_stack.close()  # type: ignore[union-attr]
+        self._restore_stack = None
 
-        # Read contents from temporary file, close it.
-        if self._temp_file is not None:
-            self._temp_file.seek(0)
-            self._output = self._temp_file.read()
-            self._temp_file.close()
+    def _finish(self, *, in_memory: bool) -> None:
+        # Only map in-memory files: a mapping would keep a temporary file on disk until the output is decoded.
+        self._output_bytes = _read_file(self._temp_file.fileno(), mappable=in_memory)  # type: ignore[union-attr]
+        self._temp_file.close()  # type: ignore[union-attr]
 
     def __str__(self) -> str:
         return self.output
@@ -196,8 +235,120 @@ class CaptureManager:
             RuntimeError: When accessing captured output before exiting the context manager.
         """
         if self._output is None:
-            raise RuntimeError("Not finished capturing")
+            if self._output_bytes is None:
+                raise RuntimeError("Not finished capturing")
+            # Decode lazily, callers often only need the return code.
+            data, self._output_bytes = self._output_bytes, None
+            try:
+                self._output = _decode_output(data)
+            finally:
+                if isinstance(data, mmap.mmap):
+                    data.close()
         return self._output
 
 
+def _install(stack: ExitStack, name: str, source_fd: int, target_fd: int) -> tuple[TextIO, TextIO]:
+    # Redirect the descriptor, then write to it through a stream of its own.
+    # The reopened stream is only flushed, never closed nor detached: it does not own the descriptor,
+    # and references kept after exit (for example by logging handlers) still write to the restored descriptor.
+    _redirect(stack, source_fd, target_fd)
+    stream = getattr(sys, name)
+    reopened = _reopen_buffered(stream, target_fd)
+    stack.callback(setattr, sys, name, stream)
+    setattr(sys, name, reopened)
+    return stream, reopened
+
+
+def _redirect(stack: ExitStack, source_fd: int, target_fd: int) -> None:
+    # Callbacks run in reverse order: restore the target first, then close the saved copy.
+    saved_fd = os.dup(target_fd)
+    stack.callback(os.close, saved_fd)
+    stack.callback(os.dup2, saved_fd, target_fd)
+    os.dup2(source_fd, target_fd)
+
+
+def _reopen_buffered(stream: TextIO, fd: int) -> TextIO:
+    # Keep the stream's buffering modes (unbuffered, line-buffered, write-through)
+    # so that Python writes stay ordered with subprocesses writes.
+    binary: BinaryIO = io.FileIO(fd, "w", closefd=False)
+    if isinstance(getattr(stream, "buffer", None), io.BufferedWriter):
+        binary = io.BufferedWriter(binary)
+    return io.TextIOWrapper(
+        binary,
+        encoding=getattr(stream, "encoding", None) or "utf8",
+        errors=getattr(stream, "errors", None) or "strict",
+        line_buffering=getattr(stream, "line_buffering", False),
+        write_through=getattr(stream, "write_through", False),
+    )
+
+
+def _flush(streams: list[TextIO]) -> None:
+    # The original streams can still be written to through references taken earlier:
+    # they come first, as they were swapped out before anything was written to the reopened ones.
+    for stream in streams:
+        stream.flush()
+
+
+def _open_memfd() -> tuple[IO[bytes], bool]:
+    try:
+        fd = os.memfd_create("failprint")
+    except OSError:
+        # Not supported by the kernel (ENOSYS) or denied by a seccomp filter (EPERM).
+        return _open_tempfile()
+    return open(fd, "w+b"), True
+
+
+def _open_tempfile() -> tuple[IO[bytes], bool]:
+    # The temporary file can be placed on a RAM disk with the FAILPRINT_TMPDIR environment variable
+    # (documented in the README).
+    tmpdir = os.environ.get("FAILPRINT_TMPDIR") or None
+    return tempfile.TemporaryFile("w+b", prefix="failprint-", dir=tmpdir), False
+
+
+def _read_file(fd: int, *, mappable: bool) -> bytes | mmap.mmap:
+    # Map large files instead of copying them. The mapping keeps the file alive once its descriptor is closed.
+    size = os.fstat(fd).st_size
+    if mappable and size >= _MMAP_THRESHOLD:
+        return mmap.mmap(fd, size, access=mmap.ACCESS_READ)
+    if hasattr(os, "pread"):
+        return os.pread(fd, size, 0)
+    os.lseek(fd, 0, os.SEEK_SET)
+    return os.read(fd, size)
+
+
+def _decode(data: bytes | mmap.mmap, errors: str = "strict") -> str:
+    # Same result as reading from a text file opened with universal newlines.
+    return str(data, "utf8", errors).replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _normalize_newlines(data: bytes) -> bytes:
+    return data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+
+def _decode_or_replace(data: bytes | mmap.mmap) -> str:
+    return _decode(data, "replace")
+
+
+def _decode_or_fallback(data: bytes | mmap.mmap) -> str:
+    # Subprocesses on Windows may write with the console encoding instead of UTF-8.
+    # The fallback decodes whole lines rather than invalid byte spans,
+    # since console encodings can be multi-byte (cp932, cp936, etc.).
+    try:
+        return _decode(data)
+    except UnicodeDecodeError:
+        fallback = os.device_encoding(0) or "mbcs"
+        return "\n".join(_decode_line(line, fallback) for line in _normalize_newlines(bytes(data)).split(b"\n"))
+
+
+def _decode_line(line: bytes, fallback: str) -> str:
+    try:
+        return line.decode("utf8")
+    except UnicodeDecodeError:
+        return line.decode(fallback, "replace")
+
+
+# Platform-specific helpers, selected once at import time.
+_open_capture_file = _open_memfd if _MEMFD else _open_tempfile
+_decode_output = _decode_or_fallback if _WINDOWS else _decode_or_replace
+
 __all__ = ["Capture", "CaptureManager"]
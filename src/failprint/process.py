@@ -39,12 +39,12 @@ def run_subprocess(
     Returns:
         The exit code and the command raw output.
     """
-    if capture == Capture.NONE:
+    if capture is Capture.NONE:
         stdout_opt = None
         stderr_opt = None
     else:
         stdout_opt = subprocess.PIPE
-        stderr_opt = subprocess.STDOUT if capture == Capture.BOTH else subprocess.PIPE
+        stderr_opt = subprocess.STDOUT if capture is Capture.BOTH else subprocess.PIPE
 
     if shell and not isinstance(cmd, str):
         cmd = printable_command(cmd)
@@ -60,9 +60,9 @@ def run_subprocess(
         check=False,
     )
 
-    if capture == Capture.NONE:
+    if capture is Capture.NONE:
         output = ""
-    elif capture == Capture.STDERR:
+    elif capture is Capture.STDERR:
         output = process.stderr
     else:
         output = process.stdout
@@ -106,7 +106,7 @@ def run_pty_subprocess(
             output_data = process.read()
         except EOFError:
             break
-        if capture == Capture.NONE:
+        if capture is Capture.NONE:
             print(output_data, end="", flush=True)  # noqa: T201
         else:
             pty_output.append(output_data)
@@ -149,7 +149,7 @@ def run_command(
         pty = False
 
     # pty can only combine, so only use pty when combining
-    if pty and capture in {Capture.BOTH, Capture.NONE}:
+    if pty and (capture is Capture.BOTH or capture is Capture.NONE):
         if shell:
             cmd = ["sh", "-c", cmd]  # type: ignore[list-item]  # we know cmd is str
         return run_pty_subprocess(cmd, capture=capture, stdin=stdin)  # type: ignore[arg-type]  # we made sure cmd is a list
@@ -187,7 +187,7 @@ def run_function(
     args = args or []
     kwargs = kwargs or {}
 
-    if capture == Capture.NONE:
+    if capture is Capture.NONE:
         return run_function_get_code(func, args=args, kwargs=kwargs), ""
 
     with capture.here(stdin=stdin) as captured:
@@ -2,9 +2,28 @@
 
 from __future__ import annotations
 
+import errno
+import mmap
+import os
+import sys
+from typing import IO, TYPE_CHECKING
+from unittest.mock import MagicMock
+
 import pytest
 
-from failprint.capture import Capture
+from failprint import capture
+from failprint.capture import (
+    _MEMFD,
+    Capture,
+    _decode_or_fallback,
+    _decode_or_replace,
+    _open_memfd,
+    _open_tempfile,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
 
 
 @pytest.mark.parametrize(
@@ -31,3 +50,152 @@ def test_cast_string(value: str | bool | Capture, expected: Capture) -> None:
         expected: The value to expect.
     """
     assert Capture.cast(value) == expected
+
+
+@pytest.mark.parametrize("value", [1, 0, 1.0, "BOTH", "unknown"])
+def test_cast_invalid_values(value: object) -> None:
+    """Refuse to cast values that do not match a Capture enumeration value.
+
+    Arguments:
+        value: The value to cast.
+    """
+    with pytest.raises(ValueError, match="is not a valid Capture"):
+        Capture.cast(value)  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize("capture", list(Capture))
+def test_str(capture: Capture) -> None:
+    """Stringify Capture enumeration values.
+
+    Arguments:
+        capture: The value to stringify.
+    """
+    assert str(capture) == capture.value
+    assert Capture.cast(str(capture)) is capture
+
+
+@pytest.mark.parametrize(
+    ("data", "expected"),
+    [
+        (b"caf\xc3\xa9\n", "café\n"),
+        (b"caf\xe9\n", "café\n"),
+        (b"utf8 caf\xc3\xa9\ncp1252 caf\xe9\n", "utf8 café\ncp1252 café\n"),
+        (b"caf\xe9\r\nutf8 caf\xc3\xa9\r\n", "café\nutf8 café\n"),
+        (b"caf\xe9\rend", "café\nend"),
+    ],
+)
+def test_decode_or_fallback(monkeypatch: pytest.MonkeyPatch, data: bytes, expected: str) -> None:
+    """Decode output mixing UTF-8 and console-encoded lines.
+
+    Arguments:
+        monkeypatch: Pytest fixture to patch objects.
+        data: The bytes to decode.
+        expected: The text to expect.
+    """
+    monkeypatch.setattr(os, "device_encoding", lambda fd: "cp1252")
+    assert _decode_or_fallback(data) == expected
+
+
+def test_decode_or_replace() -> None:
+    """Replace invalid UTF-8 bytes and normalize newlines."""
+    assert _decode_or_replace(b"caf\xc3\xa9\r\n\xff\rend") == "café\n\ufffd\nend"
+
+
+@pytest.mark.skipif(not _MEMFD, reason="memfd_create is not available")
+def test_open_memfd() -> None:
+    """Open an in-memory file to capture output."""
+    file, in_memory = _open_memfd()
+    with file:
+        assert in_memory
+        os.write(file.fileno(), b"out")
+        assert os.pread(file.fileno(), 3, 0) == b"out"
+        assert os.readlink(f"/proc/self/fd/{file.fileno()}").startswith("/memfd:failprint")
+
+
+@pytest.mark.skipif(not _MEMFD, reason="memfd_create is not available")
+@pytest.mark.parametrize("code", [errno.ENOSYS, errno.EPERM])
+def test_open_memfd_falls_back_to_tempfile(monkeypatch: pytest.MonkeyPatch, code: int) -> None:
+    """Open a temporary file when in-memory files cannot be created.
+
+    Arguments:
+        monkeypatch: Pytest fixture to patch objects.
+        code: The error code raised by `memfd_create`.
+    """
+    monkeypatch.setattr(os, "memfd_create", MagicMock(side_effect=OSError(code, os.strerror(code))))
+    file, in_memory = _open_memfd()
+    with file:
+        assert not in_memory
+        assert not os.readlink(f"/proc/self/fd/{file.fileno()}").startswith("/memfd:")
+        os.write(file.fileno(), b"out")
+        assert os.pread(file.fileno(), 3, 0) == b"out"
+
+
+def test_open_tempfile() -> None:
+    """Open a temporary file to capture output."""
+    file, in_memory = _open_tempfile()
+    with file:
+        assert not in_memory
+        os.write(file.fileno(), b"out")
+        file.seek(0)
+        assert file.read() == b"out"
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="runs on Linux only")
+def test_open_tempfile_in_failprint_tmpdir(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Open the temporary file in the directory set with `FAILPRINT_TMPDIR`.
+
+    Arguments:
+        monkeypatch: Pytest fixture to patch objects.
+        tmp_path: Pytest fixture providing a temporary directory.
+    """
+    monkeypatch.setenv("FAILPRINT_TMPDIR", str(tmp_path))
+    file, _ = _open_tempfile()
+    with file:
+        path = os.readlink(f"/proc/self/fd/{file.fileno()}")
+    assert os.path.dirname(path) == str(tmp_path)
+
+
+@pytest.mark.parametrize("open_file", [_open_memfd, _open_tempfile])
+def test_capture_through_each_file_kind(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+    open_file: Callable[[], tuple[IO[bytes], bool]],
+) -> None:
+    """Capture output through in-memory and temporary files alike.
+
+    Arguments:
+        monkeypatch: Pytest fixture to patch objects.
+        capsys: Pytest fixture to capture output.
+        open_file: The function opening the file.
+    """
+    if open_file is _open_memfd and not _MEMFD:
+        pytest.skip("memfd_create is not available")
+    monkeypatch.setattr(capture, "_open_capture_file", open_file)
+    with capsys.disabled(), Capture.BOTH.here() as captured:
+        print("out")
+        sys.stderr.write("err\n")
+        sys.stderr.flush()
+    assert sorted(str(captured).splitlines()) == ["err", "out"]
+
+
+@pytest.mark.parametrize(("open_file", "mapped"), [(_open_memfd, True), (_open_tempfile, False)])
+def test_map_only_large_in_memory_captures(
+    monkeypatch: pytest.MonkeyPatch,
+    open_file: Callable[[], tuple[IO[bytes], bool]],
+    mapped: bool,
+) -> None:
+    """Map large captures only when they are held in memory, copy them out of temporary files.
+
+    Arguments:
+        monkeypatch: Pytest fixture to patch objects.
+        open_file: The function opening the file.
+        mapped: Whether the captured output should be mapped.
+    """
+    if open_file is _open_memfd and not _MEMFD:
+        pytest.skip("memfd_create is not available")
+    monkeypatch.setattr(capture, "_open_capture_file", open_file)
+    size = 2 * capture._MMAP_THRESHOLD
+    with Capture.BOTH.here() as captured:
+        os.write(1, b"x" * size)
+    assert isinstance(captured._output_bytes, mmap.mmap) is mapped
+    assert str(captured) == "x" * size
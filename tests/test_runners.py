@@ -1,5 +1,7 @@
 """Tests for the `runners` module."""
 
+import ctypes
+import io
 import os
 import subprocess
 import sys
@@ -379,3 +381,158 @@ def test_capture_large_output() -> None:
 
     with Capture.BOTH.here():
         function()
+
+
+@pytest.mark.skipif(WINDOWS, reason="runs on Linux only")
+@pytest.mark.timeout(5, method="thread")
+def test_capture_does_not_wait_for_background_processes(capsys: pytest.CaptureFixture) -> None:
+    """Assert we stop capturing even if a background process still holds standard output.
+
+    Arguments:
+        capsys: Pytest fixture to capture output.
+    """
+    with capsys.disabled(), Capture.BOTH.here() as captured:
+        os.system("echo started; sleep 10 &")  # noqa: S605,S607
+
+    assert str(captured) == "started\n"
+
+
+def test_capture_binary_writes(capsys: pytest.CaptureFixture) -> None:
+    """Assert we capture bytes written to the underlying buffers of standard output and error.
+
+    Arguments:
+        capsys: Pytest fixture to capture output.
+    """
+    with capsys.disabled(), Capture.BOTH.here() as captured:
+        sys.stdout.buffer.write(b"out\n")
+        sys.stderr.buffer.write(b"err\n")
+
+    # Relative order depends on each stream's buffering, see next test.
+    assert sorted(str(captured).splitlines()) == ["err", "out"]
+
+
+def _run_python_with_buffered_stdio(code: str) -> subprocess.CompletedProcess:
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONUNBUFFERED"}
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)  # noqa: S603
+
+
+def test_capture_flushes_stdout_before_stderr_with_buffered_stdio() -> None:
+    """Assert buffered standard output is flushed before buffered standard error."""
+    code = """if True:
+        import sys
+        from failprint.capture import Capture
+        with Capture.BOTH.here() as captured:
+            sys.stdout.buffer.write(b"out\\n")
+            sys.stderr.buffer.write(b"err\\n")
+        sys.stderr.write(repr(str(captured)))
+    """
+    assert _run_python_with_buffered_stdio(code).stderr == repr("out\nerr\n")
+
+
+@pytest.mark.skipif(WINDOWS, reason="runs on Linux only")
+def test_capture_invalid_utf8(capsys: pytest.CaptureFixture) -> None:
+    """Assert invalid UTF-8 bytes in captured output are replaced.
+
+    Arguments:
+        capsys: Pytest fixture to capture output.
+    """
+    with capsys.disabled(), Capture.BOTH.here() as captured:
+        sys.stdout.buffer.write(b"\xff\n")
+
+    assert str(captured) == "�\n"
+
+
+@pytest.mark.skipif(WINDOWS, reason="runs on Linux only")
+@pytest.mark.parametrize("mute", [True, False])
+def test_capture_stdout_without_muting_stderr(capfd: pytest.CaptureFixture, mute: bool) -> None:
+    """Assert the output that is not captured is muted only when asked to.
+
+    Arguments:
+        capfd: Pytest fixture to capture output.
+        mute: Whether to mute standard error.
+    """
+    with Capture.STDOUT.here(mute=mute) as captured:
+        os.system("echo out; echo err >&2")  # noqa: S605,S607
+
+    assert str(captured) == "out\n"
+    assert capfd.readouterr().err == ("" if mute else "err\n")
+
+
+def test_successive_captures_keep_their_output(capsys: pytest.CaptureFixture) -> None:
+    """Assert captured outputs stay available after other captures.
+
+    Arguments:
+        capsys: Pytest fixture to capture output.
+    """
+    with capsys.disabled():
+        with Capture.BOTH.here() as first:
+            print("first")
+        with Capture.BOTH.here() as second:
+            print("second")
+
+    assert str(first) == "first\n"
+    assert str(second) == "second\n"
+
+
+@pytest.mark.skipif(WINDOWS, reason="runs on Linux only")
+@pytest.mark.timeout(5, method="thread")
+def test_capture_large_output_written_while_holding_the_gil() -> None:
+    """Assert we capture large native writes done without releasing the GIL."""
+    size = 200_000
+    with Capture.BOTH.here() as captured:
+        ctypes.PyDLL(None).write(1, b"x" * size, size)
+
+    assert str(captured) == "x" * size
+
+
+@pytest.mark.skipif(WINDOWS, reason="runs on Linux only")
+def test_capture_large_mixed_output_in_order(capsys: pytest.CaptureFixture) -> None:
+    """Assert large outputs from Python and subprocesses are captured in order.
+
+    Arguments:
+        capsys: Pytest fixture to capture output.
+    """
+    with capsys.disabled(), Capture.BOTH.here() as captured:
+        print("start", flush=True)
+        os.system("seq 1 50000")  # noqa: S605,S607
+        print("end", flush=True)
+
+    lines = str(captured).splitlines()
+    assert lines == ["start", *map(str, range(1, 50001)), "end"]
+
+
+def test_capture_writes_through_saved_references_with_buffered_stdio() -> None:
+    """Assert we capture writes to streams saved before capturing, even when they are block-buffered."""
+    code = """if True:
+        import sys
+        from failprint.capture import Capture
+        out = sys.stdout
+        with Capture.BOTH.here() as captured:
+            out.write("via saved ref\\n")
+            print("via print")
+        sys.stderr.write(repr(str(captured)))
+    """
+    process = _run_python_with_buffered_stdio(code)
+    assert process.stderr == repr("via saved ref\nvia print\n")
+    assert process.stdout == ""
+
+
+def test_capture_installs_text_streams(capsys: pytest.CaptureFixture) -> None:
+    """Assert standard output and error stay text streams while capturing.
+
+    Arguments:
+        capsys: Pytest fixture to capture output.
+    """
+    with capsys.disabled(), Capture.BOTH.here() as captured:
+        assert isinstance(sys.stdout, io.TextIOBase)
+        assert isinstance(sys.stderr, io.TextIOBase)
+        print("out")
+
+    assert str(captured) == "out\n"
+
+
+def test_muted_stream_is_not_reopened() -> None:
+    """Assert the muted stream is left in place, only its descriptor is redirected."""
+    stderr = sys.stderr
+    with Capture.STDOUT.here():
+        assert sys.stderr is stderr